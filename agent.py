@@ -1,3 +1,8 @@
+import re
+import json
+import logging
+import hashlib
+from collections import OrderedDict
 from typing import Literal, List, Any
 from langchain_core.tools import tool
 from langgraph.types import Command
@@ -7,97 +12,261 @@ from langchain_core.prompts.chat import ChatPromptTemplate
 from langgraph.graph import START, StateGraph, END
 from langgraph.prebuilt import create_react_agent
 from langchain_core.messages import HumanMessage, AIMessage
-from prompt_library.prompt import system_prompt
-from utils.llms import LLMModel
+from prompt_library.prompt import SUPERVISOR_SYSTEM_PROMPT, INFO_SYSTEM_PROMPT, BOOKING_SYSTEM_PROMPT, COMBINED_SYSTEM_PROMPT
+from utils.llms import get_llm, get_router_llm
 from toolkit.toolkits import *
 from pydantic import BaseModel, Field
 
+logger = logging.getLogger(__name__)
+
 class Router(BaseModel):
     """Router to determine next action"""
-    next: Literal["information_node", "booking_node", "FINISH"] = Field(
+    next: Literal["information_node", "booking_node", "combined_node", "FINISH"] = Field(
         description="The next node to route to based on the user's query"
     )
     reasoning: str = Field(
         description="Brief explanation for why this routing decision was made"
     )
 
+def parse_router_response(content):
+    """Parse the supervisor's JSON reply into a Router, raising ValueError when it is malformed"""
+    text = content.strip().removeprefix("```json").removeprefix("```").removesuffix("```").strip()
+    return Router.model_validate(json.loads(text))
+
+# Phrases of a negative availability answer, in the tools' wording or the agent's paraphrase
+NO_AVAILABILITY_MARKERS = ("no available", "not available", "fully booked")
+SLOT_TIME_RE = re.compile(r'\b\d{1,2}:\d{2}\b')
+
+def has_no_availability(content):
+    """True when a lowercased reply says something is not available"""
+    return any(marker in content for marker in NO_AVAILABILITY_MARKERS)
+
+def reports_no_availability(content):
+    """True when a lowercased reply only reports that nothing is free, without offering any other slot"""
+    return has_no_availability(content) and not SLOT_TIME_RE.search(content)
+
+BOOK_WORD_RE = re.compile(r'\bbook\b')
+
+def message_flags(last_content, first_msg):
+    """Scan the lowercased last and first messages once for the keywords routing relies on"""
+    return {
+        'has_available': 'available' in last_content,
+        'has_not_available': has_no_availability(last_content),
+        'has_slot_time': SLOT_TIME_RE.search(last_content) is not None,
+        'has_slot': 'slot' in last_content,
+        'first_has_check': 'check' in first_msg,
+        # Whole word only, so "booked"/"unbooked" in an availability question isn't booking intent
+        'first_has_book': BOOK_WORD_RE.search(first_msg) is not None,
+        'first_has_available': 'available' in first_msg,
+        'first_has_appointment': 'appointment' in first_msg,
+    }
+
+def keyword_route(last_name, flags, info_calls, booking_calls):
+    """
+    Deterministic routing for the common conversation shapes.
+    
+    Returns a (goto, reasoning) tuple, or None when the shape is ambiguous and
+    the supervisor LLM has to decide.
+    """
+    if last_name == 'information_node':
+        if flags['has_not_available']:
+            # "Not available, but ..." offers other slots; let the LLM decide rather than book
+            # a time the user never asked for
+            if flags['has_slot_time']:
+                return None
+            return "FINISH", "Rule: no availability found"
+        if flags['has_available'] or flags['has_slot']:
+            if flags['first_has_book'] and booking_calls == 0:
+                return "booking_node", "Rule: availability confirmed, routing to booking"
+            return "FINISH", "Rule: availability information provided"
+        return None
+    
+    # "Check and book" is handled end to end by a single agent
+    if info_calls == 0 and booking_calls == 0 and flags['first_has_check'] and flags['first_has_book']:
+        return "combined_node", "Rule: check and book in one step"
+    
+    # First turn of an availability request
+    if info_calls == 0 and booking_calls == 0 and (flags['first_has_check'] or flags['first_has_available']):
+        return "information_node", "Rule: checking availability first"
+    
+    return None
+
+def compact_history(msgs, keep_last=2):
+    """
+    Convert the conversation into supervisor chat messages, keeping the first
+    user message and the last `keep_last` messages verbatim and folding
+    everything in between into a one-line summary.
+    """
+    def as_chat(msg):
+        return {"role": "assistant" if isinstance(msg, AIMessage) else "user", "content": msg.content}
+    
+    if len(msgs) <= keep_last + 1:
+        return [as_chat(msg) for msg in msgs]
+    
+    summary = [
+        {"from": getattr(msg, 'name', None) or "user", "said": msg.content.strip().split("\n")[0][:100]}
+        for msg in msgs[1:-keep_last]
+    ]
+    return [
+        as_chat(msgs[0]),
+        {"role": "system", "content": f"Prior nodes: {json.dumps(summary)}"},
+        *[as_chat(msg) for msg in msgs[-keep_last:]],
+    ]
+
+# Single pattern pulling the doctor, 12-hour time and date out of the information_node reply
+BOOKING_RE = re.compile(
+    r'Dr\.\s+(?P<doctor>[A-Za-z\s]+)'
+    r'|(?P<hour>\d{1,2}):(?P<minute>\d{2})\s*(?P<period>(?i:AM|PM))'
+    r'|(?P<date>\d{2}-\d{2}-\d{4})'
+)
+
+# Routing decisions keyed on the shape of the conversation so that repeated
+# shapes skip the supervisor LLM call entirely.
+ROUTE_CACHE_MAXSIZE = 1024
+_route_cache = OrderedDict()
+
+def route_cache_key(last_name, last_content, flags, info_calls, booking_calls):
+    """Build the canonical cache key for a supervisor routing decision"""
+    content_hash = hashlib.blake2b(last_content.encode(), digest_size=8).hexdigest()
+    has_check = flags['first_has_check']
+    has_book = flags['first_has_book']
+    intent_flags = ((has_check and has_book) << 2) | (has_check << 1) | has_book
+    return (last_name, content_hash, info_calls, booking_calls, intent_flags)
+
+def get_cached_route(key):
+    route = _route_cache.get(key)
+    if route is not None:
+        _route_cache.move_to_end(key)
+    return route
+
+def cache_route(key, goto, reasoning):
+    _route_cache[key] = (goto, reasoning)
+    _route_cache.move_to_end(key)
+    if len(_route_cache) > ROUTE_CACHE_MAXSIZE:
+        _route_cache.popitem(last=False)
+
 class AgentState(TypedDict):
     messages: Annotated[list[Any], add_messages]
     id_number: int
     next: str
     query: str
     current_reasoning: str
+    info_calls: int
+    booking_calls: int
+    last_source: str
 
 class DoctorAppointmentAgent:
     def __init__(self):
-        llm_model = LLMModel()
-        self.llm_model = llm_model.get_model()
-        print("LLM model Name:-", self.llm_model)
+        self.llm_model = get_llm()
+        # Routing is a small classification task, so the supervisor uses a cheaper model
+        self.router_llm = get_router_llm()
+        logger.info("LLM model Name: %s", self.llm_model)
+        
+        # Node agents only depend on static prompts and tools, so build them once
+        self.information_agent = create_react_agent(
+            model=self.llm_model,
+            tools=[check_availability_by_doctor, check_availability_by_specialization],
+            prompt=ChatPromptTemplate.from_messages(
+                [
+                    ("system", INFO_SYSTEM_PROMPT),
+                    ("placeholder", "{messages}"),
+                ]
+            )
+        )
+        self.booking_agent = create_react_agent(
+            model=self.llm_model,
+            tools=[set_appointment, cancel_appointment, reschedule_appointment],
+            prompt=ChatPromptTemplate.from_messages(
+                [
+                    ("system", BOOKING_SYSTEM_PROMPT),
+                    ("placeholder", "{messages}"),
+                ]
+            )
+        )
+        self.combined_agent = create_react_agent(
+            model=self.llm_model,
+            tools=[check_availability_by_specialization, check_availability_by_doctor, set_appointment],
+            prompt=ChatPromptTemplate.from_messages(
+                [
+                    ("system", COMBINED_SYSTEM_PROMPT),
+                    ("placeholder", "{messages}"),
+                ]
+            )
+        )
     
-    def supervisor_node(self, state: AgentState) -> Command[Literal['information_node', 'booking_node', '__end__']]:
-        print("**************************below is my state****************************")
-        print(state)
+    async def supervisor_node(self, state: AgentState) -> Command[Literal['information_node', 'booking_node', 'combined_node', '__end__']]:
+        logger.debug("supervisor state=%r", state)
         
-        # Count how many times each node has been called
-        info_calls = len([m for m in state['messages'] if hasattr(m, 'name') and m.name == 'information_node'])
-        booking_calls = len([m for m in state['messages'] if hasattr(m, 'name') and m.name == 'booking_node'])
+        # How many times each node has been called, tracked by the nodes themselves
+        info_calls = state.get('info_calls', 0)
+        booking_calls = state.get('booking_calls', 0)
         
         # Prevent infinite loops
         if info_calls + booking_calls >= 6:
             return Command(goto=END, update={'next': 'FINISH', 'current_reasoning': 'Maximum iterations reached'})
         
-        system_message = f"""{system_prompt}
-
-    IMPORTANT ROUTING RULES:
-    1. If user asks to "check availability", route to information_node
-    2. If user asks to "check AND book", FIRST route to information_node to check availability
-    3. After information_node confirms availability, route to booking_node to complete the booking
-    4. If booking was completed (success or failure), route to FINISH
-    5. If no progress after 3 attempts, route to FINISH
-
-    Current state:
-    - User ID: {state['id_number']}
-    - Information checks done: {info_calls}
-    - Booking attempts done: {booking_calls}
-    - Last message was from: {state['messages'][-1].name if hasattr(state['messages'][-1], 'name') else 'user'}
-
-    Respond with JSON: {{"next": "information_node"|"booking_node"|"FINISH", "reasoning": "explanation"}}
-    """
+        last_msg = state['messages'][-1]
+        last_name = state.get('last_source') or None
+        last_content = getattr(last_msg, 'content', "").lower()
+        first_msg = state['messages'][0].content.lower() if state['messages'] else ""
+        flags = message_flags(last_content, first_msg)
         
-        messages = [
-            {"role": "system", "content": system_message},
-        ] + [
-            {"role": "assistant" if isinstance(msg, AIMessage) else "user", "content": msg.content}
-            for msg in state["messages"]
-        ]
+        # Common shapes are routed by rules without any LLM call
+        route = keyword_route(last_name, flags, info_calls, booking_calls)
+        if route is not None:
+            goto, reasoning = route
+            logger.debug("rule goto: %s", goto)
+            return Command(
+                goto=goto if goto != "FINISH" else END,
+                update={'next': goto, 'current_reasoning': reasoning}
+            )
+        
+        # Skip the LLM when we have already routed an identical conversation shape
+        cache_key = route_cache_key(last_name, last_content, flags, info_calls, booking_calls)
+        cached_route = get_cached_route(cache_key)
+        if cached_route is not None:
+            goto, reasoning = cached_route
+            logger.debug("cached goto: %s", goto)
+            return Command(
+                goto=goto if goto != "FINISH" else END,
+                update={'next': goto, 'current_reasoning': reasoning}
+            )
         
-        print("***********************supervisor messages*****************************************")
+        # Per-turn state goes after the static prompt so the prompt prefix stays cacheable
+        state_message = f"""Current state:
+- User ID: {state['id_number']}
+- Information checks done: {info_calls}
+- Booking attempts done: {booking_calls}
+- Last message was from: {last_name or 'user'}
+"""
+        
+        messages = [
+            {"role": "system", "content": SUPERVISOR_SYSTEM_PROMPT},
+            {"role": "system", "content": state_message},
+        ] + compact_history(state["messages"])
         
         try:
-            response = self.llm_model.with_structured_output(Router).invoke(messages)
+            # Plain JSON reply parsed locally; structured-output decoding adds noticeable latency
+            response = parse_router_response((await self.router_llm.ainvoke(messages)).content)
             goto = response.next
             reasoning = response.reasoning
+            cache_route(cache_key, goto, reasoning)
             
         except Exception as e:
-            print(f"Structured output error: {e}")
+            logger.warning("Router output error: %s", e)
             
             # IMPROVED FALLBACK LOGIC
-            last_msg = state['messages'][-1]
-            last_content = last_msg.content.lower() if hasattr(last_msg, 'content') else ""
-            
             # Check if this is the first user message asking to check and book
-            first_msg = state['messages'][0].content.lower() if state['messages'] else ""
-            is_check_and_book = 'check' in first_msg and 'book' in first_msg
+            is_check_and_book = flags['first_has_check'] and flags['first_has_book']
             
             # If last message is from information_node
-            if hasattr(last_msg, 'name') and last_msg.name == 'information_node':
+            if last_name == 'information_node':
                 # Check if availability was confirmed
-                if ('available' in last_content or 'slot' in last_content) and \
-                ('no available' not in last_content and 'not available' not in last_content):
+                if (flags['has_available'] or flags['has_slot']) and not flags['has_not_available']:
                     # Availability confirmed, route to booking
                     goto = "booking_node"
                     reasoning = "Fallback: availability confirmed, routing to booking"
-                elif 'no available' in last_content or 'not available' in last_content:
+                elif flags['has_not_available']:
                     goto = "FINISH"
                     reasoning = "Fallback: no availability found"
                 else:
@@ -110,16 +279,16 @@ class DoctorAppointmentAgent:
                         reasoning = "Fallback: information provided"
             
             # If last message is from booking_node, finish
-            elif hasattr(last_msg, 'name') and last_msg.name == 'booking_node':
+            elif last_name == 'booking_node':
                 goto = "FINISH"
                 reasoning = "Fallback: booking complete"
             
             # If this is the first message and no nodes called yet
             elif info_calls == 0 and booking_calls == 0:
-                if 'check' in first_msg or 'available' in first_msg:
+                if flags['first_has_check'] or flags['first_has_available']:
                     goto = "information_node"
                     reasoning = "Fallback: checking availability first"
-                elif 'book' in first_msg or 'appointment' in first_msg:
+                elif flags['first_has_book'] or flags['first_has_appointment']:
                     goto = "booking_node"
                     reasoning = "Fallback: direct booking request"
                 else:
@@ -130,8 +299,7 @@ class DoctorAppointmentAgent:
                 goto = "FINISH"
                 reasoning = "Fallback: ending conversation"
         
-        print(f"********************************goto: {goto}*************************")
-        print(f"********************************reasoning: {reasoning}*************************")
+        logger.debug("goto: %s reasoning: %s", goto, reasoning)
             
         if goto == "FINISH":
             goto = END
@@ -144,51 +312,11 @@ class DoctorAppointmentAgent:
             }
         )
 
-    def information_node(self, state: AgentState) -> Command[Literal['supervisor']]:
-        print("*****************called information node************")
-
-        info_system_prompt = """You are a specialized agent to provide information about doctor availability.
-
-    YOUR ONLY TOOLS:
-    - check_availability_by_specialization: Check availability by specialization
-    - check_availability_by_doctor: Check availability by specific doctor
-
-    CRITICAL FORMATTING RULES:
-    1. Date format: DD-MM-YYYY (e.g., 08-08-2024) - TWO digits for day and month
-    2. Doctor names MUST be ALL LOWERCASE with spaces (e.g., "emily johnson" NOT "Emily Johnson")
-    3. Valid doctor names (use EXACTLY as written):
-    kevin anderson, robert martinez, susan davis, daniel miller, sarah wilson,
-    michael green, lisa brown, jane smith, emily johnson, john doe
-    4. Valid specializations:
-    general_dentist, cosmetic_dentist, prosthodontist, pediatric_dentist,
-    emergency_dentist, oral_surgeon, orthodontist
+    async def information_node(self, state: AgentState) -> Command[Literal['supervisor', '__end__']]:
+        logger.debug("called information node")
 
-    WORKFLOW:
-    - If user asks about a specialization (e.g., "general dentist"), use check_availability_by_specialization
-    - This will return available doctors with their time slots
-    - DO NOT try to book appointments - you only check availability
-    - Current year is 2024
-
-    Example:
-    User: "check if general dentist available on 8 august 2024"
-    Action: check_availability_by_specialization(desired_date="08-08-2024", specialization="general_dentist")
-    """
-        
-        prompt_template = ChatPromptTemplate.from_messages(
-            [
-                ("system", info_system_prompt),
-                ("placeholder", "{messages}"),
-            ]
-        )
-        
-        information_agent = create_react_agent(
-            model=self.llm_model,
-            tools=[check_availability_by_doctor, check_availability_by_specialization],
-            prompt=prompt_template
-        )
-        
         try:
-            result = information_agent.invoke(state)
+            result = await self.information_agent.ainvoke(state)
             final_message = result["messages"][-1].content
         except Exception as e:
             error_msg = str(e)
@@ -200,7 +328,7 @@ class DoctorAppointmentAgent:
                     user_query = state['messages'][0].content if state['messages'] else ""
                     # Extract date from query
                     if "8 august 2024" in user_query.lower() or "08-08-2024" in user_query:
-                        result = check_availability_by_specialization.invoke({
+                        result = await check_availability_by_specialization.ainvoke({
                             "desired_date": "08-08-2024",
                             "specialization": "general_dentist"
                         })
@@ -210,32 +338,48 @@ class DoctorAppointmentAgent:
             else:
                 final_message = f"I encountered an error while checking availability: {error_msg}"
         
-        return Command(
-            update={
-                "messages": [AIMessage(content=final_message, name="information_node")]
-            },
-            goto="supervisor",
-        )
+        update = {
+            "messages": [AIMessage(content=final_message, name="information_node")],
+            "info_calls": state.get("info_calls", 0) + 1,
+            "last_source": "information_node",
+        }
+        
+        # Nothing left to do when there is no availability, so skip the supervisor round trip
+        if reports_no_availability(final_message.lower()):
+            update.update({"next": "FINISH", "current_reasoning": "No availability found"})
+            return Command(update=update, goto=END)
+        
+        return Command(update=update, goto="supervisor")
 
-    def booking_node(self, state: AgentState) -> Command[Literal['supervisor']]:
-        print("*****************called booking node************")
+    async def booking_node(self, state: AgentState) -> Command[Literal['__end__']]:
+        logger.debug("called booking node")
 
-        # Extract info from previous information_node message
-        info_messages = [m for m in state['messages'] if hasattr(m, 'name') and m.name == 'information_node']
-        availability_info = info_messages[-1].content if info_messages else ""
+        # Extract info from the latest information_node message in a single backwards pass
+        availability_info = next(
+            (m.content for m in reversed(state['messages']) if getattr(m, 'name', None) == 'information_node'),
+            ""
+        )
+        
+        # Scan the availability info once, keeping the first doctor, time and date found
+        doctor_match = time_match = date_match = None
+        for match in BOOKING_RE.finditer(availability_info):
+            if match.group('doctor') is not None:
+                doctor_match = doctor_match or match
+            elif match.group('hour') is not None:
+                time_match = time_match or match
+            else:
+                date_match = date_match or match
+            if doctor_match and time_match and date_match:
+                break
         
-        # Extract doctor name from availability info
-        import re
-        doctor_match = re.search(r'Dr\.\s+([A-Za-z\s]+)', availability_info)
-        extracted_doctor = doctor_match.group(1).strip().lower() if doctor_match else ""
+        extracted_doctor = doctor_match.group('doctor').strip().lower() if doctor_match else ""
         
-        # Extract time from availability info (looking for patterns like "8:00 PM" or "20:00")
-        time_match = re.search(r'(\d{1,2}):(\d{2})\s*(AM|PM)', availability_info, re.IGNORECASE)
+        # Time is reported like "8:00 PM"
         extracted_time = ""
         if time_match:
-            hour = int(time_match.group(1))
-            minute = time_match.group(2)
-            period = time_match.group(3).upper()
+            hour = int(time_match.group('hour'))
+            minute = time_match.group('minute')
+            period = time_match.group('period').upper()
             # Convert to 24-hour format
             if period == 'PM' and hour != 12:
                 hour += 12
@@ -243,67 +387,27 @@ class DoctorAppointmentAgent:
                 hour = 0
             extracted_time = f"{hour:02d}:{minute}"
         
-        # Extract date
-        date_match = re.search(r'(\d{2}-\d{2}-\d{4})', availability_info)
-        extracted_date = date_match.group(1) if date_match else ""
-        
-        booking_system_prompt = f"""You are a specialized booking agent. Your ONLY job is to book appointments.
-
-    AVAILABLE TOOLS - YOU MUST USE ONE OF THESE:
-    1. set_appointment(desired_date, id_number, doctor_name) - Book a new appointment
-    2. cancel_appointment(date, id_number, doctor_name) - Cancel an appointment  
-    3. reschedule_appointment(old_date, new_date, id_number, doctor_name) - Reschedule an appointment
-
-    CRITICAL: DO NOT try to call any other tools. Only use the 3 tools listed above.
-
-    CURRENT BOOKING CONTEXT:
-    - Patient ID: {state['id_number']}
-    - Availability check result: {availability_info}
-    - Extracted doctor name: {extracted_doctor}
-    - Extracted date: {extracted_date}
-    - Extracted time: {extracted_time}
-
-    INSTRUCTIONS FOR BOOKING:
-    1. The user wants to BOOK an appointment
-    2. Use the extracted information above to call set_appointment
-    3. Parameters:
-    - desired_date: "{extracted_date} {extracted_time}" (format: DD-MM-YYYY HH:MM)
-    - id_number: {state['id_number']}
-    - doctor_name: "{extracted_doctor}" (must be lowercase)
-
-    VALID DOCTOR NAMES (use exactly as listed):
-    kevin anderson, robert martinez, susan davis, daniel miller, sarah wilson,
-    michael green, lisa brown, jane smith, emily johnson, john doe
-
-    EXAMPLE:
-    If extracted data shows: doctor="Emily Johnson", date="08-08-2024", time="20:00"
-    Call: set_appointment(desired_date="08-08-2024 20:00", id_number={state['id_number']}, doctor_name="emily johnson")
-
-    NOW PROCEED TO BOOK THE APPOINTMENT using set_appointment tool with the extracted information.
-    """
-        
-        prompt_template = ChatPromptTemplate.from_messages(
-            [
-                ("system", booking_system_prompt),
-                ("user", f"Please book the appointment with the information provided. Use set_appointment tool now."),
-            ]
-        )
+        extracted_date = date_match.group('date') if date_match else ""
         
-        booking_agent = create_react_agent(
-            model=self.llm_model,
-            tools=[set_appointment, cancel_appointment, reschedule_appointment],
-            prompt=prompt_template
-        )
-
         try:
             # Create a modified state for the booking agent
+            # The per-call booking context travels as the trailing user message so the
+            # system prompt stays static
+            booking_context = f"""CURRENT BOOKING CONTEXT:
+- Patient ID: {state['id_number']}
+- Availability check result: {availability_info}
+- Extracted doctor name: {extracted_doctor}
+- Extracted date: {extracted_date}
+- Extracted time: {extracted_time}
+
+Book appointment for patient {state['id_number']} with Dr. {extracted_doctor} on {extracted_date} at {extracted_time}. Use set_appointment tool now."""
             booking_state = {
                 "messages": [
-                    HumanMessage(content=f"Book appointment for patient {state['id_number']} with Dr. {extracted_doctor} on {extracted_date} at {extracted_time}")
+                    HumanMessage(content=booking_context)
                 ]
             }
             
-            result = booking_agent.invoke(booking_state)
+            result = await self.booking_agent.ainvoke(booking_state)
             final_message = result["messages"][-1].content
             
             # If the result is empty or still has errors, try direct tool invocation
@@ -311,7 +415,7 @@ class DoctorAppointmentAgent:
                 if extracted_doctor and extracted_date and extracted_time:
                     try:
                         datetime_str = f"{extracted_date} {extracted_time}"
-                        direct_result = set_appointment.invoke({
+                        direct_result = await set_appointment.ainvoke({
                             "desired_date": datetime_str,
                             "id_number": state['id_number'],
                             "doctor_name": extracted_doctor
@@ -329,7 +433,7 @@ class DoctorAppointmentAgent:
             if extracted_doctor and extracted_date and extracted_time:
                 try:
                     datetime_str = f"{extracted_date} {extracted_time}"
-                    direct_result = set_appointment.invoke({
+                    direct_result = await set_appointment.ainvoke({
                         "desired_date": datetime_str,
                         "id_number": state['id_number'],
                         "doctor_name": extracted_doctor
@@ -342,9 +446,43 @@ class DoctorAppointmentAgent:
         
         return Command(
             update={
-                "messages": [AIMessage(content=final_message, name="booking_node")]
+                "messages": [AIMessage(content=final_message, name="booking_node")],
+                "booking_calls": state.get("booking_calls", 0) + 1,
+                "last_source": "booking_node",
+                "next": "FINISH",
+                "current_reasoning": "Booking complete",
+            },
+            # Booking is always the last step, so end without another supervisor turn
+            goto=END,
+        )
+
+    async def combined_node(self, state: AgentState) -> Command[Literal['__end__']]:
+        logger.debug("called combined node")
+
+        # One ReAct trajectory checks availability and books, instead of the
+        # information -> supervisor -> booking round trips
+        combined_state = {
+            "messages": state['messages'] + [
+                HumanMessage(content=f"Patient ID for booking: {state['id_number']}")
+            ]
+        }
+        
+        try:
+            result = await self.combined_agent.ainvoke(combined_state)
+            final_message = result["messages"][-1].content
+        except Exception as e:
+            final_message = f"I encountered an error while checking and booking the appointment: {str(e)}"
+        
+        return Command(
+            update={
+                "messages": [AIMessage(content=final_message, name="combined_node")],
+                "info_calls": state.get("info_calls", 0) + 1,
+                "booking_calls": state.get("booking_calls", 0) + 1,
+                "last_source": "combined_node",
+                "next": "FINISH",
+                "current_reasoning": "Check and book complete",
             },
-            goto="supervisor",
+            goto=END,
         )
 
     def workflow(self):
@@ -352,6 +490,7 @@ class DoctorAppointmentAgent:
         self.graph.add_node("supervisor", self.supervisor_node)
         self.graph.add_node("information_node", self.information_node)
         self.graph.add_node("booking_node", self.booking_node)
+        self.graph.add_node("combined_node", self.combined_node)
         self.graph.add_edge(START, "supervisor")
         self.app = self.graph.compile()
         return self.app
\ No newline at end of file
@@ -1,13 +1,16 @@
 import re
 from pydantic import BaseModel, Field, field_validator
 
+DATETIME_PATTERN = re.compile(r'^\d{2}-\d{2}-\d{4} \d{2}:\d{2}$')
+DATE_PATTERN = re.compile(r'^\d{2}-\d{2}-\d{4}$')
+
 
 class DateTimeModel(BaseModel):
     date:str=Field(description="Properly formatted date", pattern=r'^\d{2}-\d{2}-\d{4} \d{2}:\d{2}$')
     
     @field_validator("date")
     def check_format_date(cls, v):
-        if not re.match(r'^\d{2}-\d{2}-\d{4} \d{2}:\d{2}$', v):  # Ensures 'DD-MM-YYYY HH:MM' format
+        if not DATETIME_PATTERN.match(v):  # Ensures 'DD-MM-YYYY HH:MM' format
             raise ValueError("The date should be in format 'DD-MM-YYYY HH:MM'")
         return v
     
@@ -15,7 +18,7 @@ class DateModel(BaseModel):
     date: str = Field(description="Properly formatted date", pattern=r'^\d{2}-\d{2}-\d{4}$')
     @field_validator("date")
     def check_format_date(cls, v):
-        if not re.match(r'^\d{2}-\d{2}-\d{4}$', v):  # Ensures DD-MM-YYYY format
+        if not DATE_PATTERN.match(v):  # Ensures DD-MM-YYYY format
             raise ValueError("The date must be in the format 'DD-MM-YYYY'")
         return v
      
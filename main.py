@@ -1,13 +1,25 @@
+import json
+from contextlib import asynccontextmanager
+from typing import List
 from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from agent import DoctorAppointmentAgent
 from langchain_core.messages import HumanMessage
+from toolkit.toolkits import compact_journal
 import os
 
 os.environ.pop("SSL_CERT_FILE", None)
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Bring the CSV up to date with bookings journaled by the previous run
+    compact_journal()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Define Pydantic model to accept request body
 class UserQuery(BaseModel):
@@ -15,23 +27,55 @@ class UserQuery(BaseModel):
     messages: str
 
 agent = DoctorAppointmentAgent()
+# Compile the graph once instead of on every request
+app_graph = agent.workflow()
 
-@app.post("/execute")
-def execute_agent(user_input: UserQuery):
-    app_graph = agent.workflow()
-    
+def build_query_data(user_input: UserQuery):
     # Prepare agent state as expected by the workflow
     input = [
         HumanMessage(content=user_input.messages)
     ]
-    query_data = {
+    return {
         "messages": input,
         "id_number": user_input.id_number,
         "next": "",
         "query": "",
         "current_reasoning": "",
+        "info_calls": 0,
+        "booking_calls": 0,
+        "last_source": "",
     }
+
+@app.post("/execute")
+async def execute_agent(user_input: UserQuery):
+    query_data = build_query_data(user_input)
     #config = {"configurable": {"thread_id": "1", "recursion_limit": 100}}  
 
-    response = app_graph.invoke(query_data,config={"recursion_limit": 20})
+    response = await app_graph.ainvoke(query_data,config={"recursion_limit": 20})
     return {"messages": response["messages"]}
+
+@app.post("/execute_batch")
+async def execute_agent_batch(user_inputs: List[UserQuery]):
+    # Run all sessions of the batch concurrently so their LLM calls overlap
+    query_batch = [build_query_data(user_input) for user_input in user_inputs]
+    responses = await app_graph.abatch(query_batch, config={"recursion_limit": 20})
+    return [{"messages": response["messages"]} for response in responses]
+
+@app.post("/execute_stream")
+async def execute_agent_stream(user_input: UserQuery):
+    query_data = build_query_data(user_input)
+
+    async def node_updates():
+        # One JSON line per completed node, so the UI can render progress as it happens
+        async for chunk in app_graph.astream(query_data, config={"recursion_limit": 20}, stream_mode="updates"):
+            for node, update in chunk.items():
+                update = update or {}
+                event = {"node": node}
+                if "current_reasoning" in update:
+                    event["next"] = update.get("next", "")
+                    event["reasoning"] = update["current_reasoning"]
+                if update.get("messages"):
+                    event["content"] = update["messages"][-1].content
+                yield json.dumps(event) + "\n"
+
+    return StreamingResponse(node_updates(), media_type="application/x-ndjson")
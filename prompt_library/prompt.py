@@ -1,4 +1,4 @@
-members_dict = {'information_node':'specialized agent to provide information related to availability of doctors or any FAQs related to hospital.','booking_node':'specialized agent to only to book, cancel or reschedule appointment'}
+members_dict = {'information_node':'specialized agent to provide information related to availability of doctors or any FAQs related to hospital.','booking_node':'specialized agent to only to book, cancel or reschedule appointment','combined_node':'specialized agent to check availability and book the appointment in one step when the user asks for both'}
 
 options = list(members_dict.keys()) + ["FINISH"]
 
@@ -19,3 +19,101 @@ system_prompt = (
     "3. If more than 10 total steps have occurred in this session, immediately respond with FINISH to prevent infinite recursion.\n"
     "4. Always use previous context and results to determine if the user's intent has been satisfied. If it has — FINISH.\n"
 )
+
+# Reference data shared byte-for-byte by every node prompt, so a self-hosted backend
+# with prefix caching (e.g. vLLM --enable-prefix-caching) reuses its KV cache across
+# nodes and users. Nothing user specific may ever be added here.
+SHARED_PROMPT_PREFIX = """CLINIC REFERENCE DATA:
+- Date format: DD-MM-YYYY (e.g., 08-08-2024), date with time: DD-MM-YYYY HH:MM (e.g., 08-08-2024 20:00)
+- Valid doctor names (ALL LOWERCASE, use EXACTLY as written):
+kevin anderson, robert martinez, susan davis, daniel miller, sarah wilson,
+michael green, lisa brown, jane smith, emily johnson, john doe
+- Valid specializations:
+general_dentist, cosmetic_dentist, prosthodontist, pediatric_dentist,
+emergency_dentist, oral_surgeon, orthodontist
+
+"""
+
+# Static prompts are kept byte-identical across turns so the provider prompt cache
+# can reuse them; per-turn state is always sent after them in a separate message.
+SUPERVISOR_SYSTEM_PROMPT = (
+    SHARED_PROMPT_PREFIX +
+    f"{system_prompt}\n"
+    "IMPORTANT ROUTING RULES:\n"
+    "1. If user asks to \"check availability\", route to information_node\n"
+    "2. If user asks to \"check AND book\", route to combined_node which checks availability and books in one step\n"
+    "3. After information_node confirms availability, route to booking_node to complete the booking\n"
+    "4. If booking was completed (success or failure), route to FINISH\n"
+    "5. If no progress after 3 attempts, route to FINISH\n\n"
+    "Respond with JSON: {\"next\": \"information_node\"|\"booking_node\"|\"combined_node\"|\"FINISH\", \"reasoning\": \"explanation\"}\n"
+)
+
+INFO_SYSTEM_PROMPT = SHARED_PROMPT_PREFIX + """You are a specialized agent to provide information about doctor availability.
+
+YOUR ONLY TOOLS:
+- check_availability_by_specialization: Check availability by specialization
+- check_availability_by_doctor: Check availability by specific doctor
+
+CRITICAL FORMATTING RULES:
+1. Date format: DD-MM-YYYY (e.g., 08-08-2024) - TWO digits for day and month
+2. Doctor names MUST be ALL LOWERCASE with spaces (e.g., "emily johnson" NOT "Emily Johnson")
+3. Only use doctor names and specializations from the CLINIC REFERENCE DATA above
+
+WORKFLOW:
+- If user asks about a specialization (e.g., "general dentist"), use check_availability_by_specialization
+- This will return available doctors with their time slots
+- DO NOT try to book appointments - you only check availability
+- Current year is 2024
+
+Example:
+User: "check if general dentist available on 8 august 2024"
+Action: check_availability_by_specialization(desired_date="08-08-2024", specialization="general_dentist")
+"""
+
+BOOKING_SYSTEM_PROMPT = SHARED_PROMPT_PREFIX + """You are a specialized booking agent. Your ONLY job is to book appointments.
+
+AVAILABLE TOOLS - YOU MUST USE ONE OF THESE:
+1. set_appointment(desired_date, id_number, doctor_name) - Book a new appointment
+2. cancel_appointment(date, id_number, doctor_name) - Cancel an appointment
+3. reschedule_appointment(old_date, new_date, id_number, doctor_name) - Reschedule an appointment
+
+CRITICAL: DO NOT try to call any other tools. Only use the 3 tools listed above.
+
+INSTRUCTIONS FOR BOOKING:
+1. The user wants to BOOK an appointment
+2. Use the CURRENT BOOKING CONTEXT from the user message to call set_appointment
+3. Parameters:
+- desired_date: "<extracted date> <extracted time>" (format: DD-MM-YYYY HH:MM)
+- id_number: the patient ID from the booking context
+- doctor_name: the extracted doctor name (must be lowercase)
+
+VALID DOCTOR NAMES: use exactly as listed in the CLINIC REFERENCE DATA above
+
+EXAMPLE:
+If extracted data shows: doctor="Emily Johnson", date="08-08-2024", time="20:00", patient ID=1000082
+Call: set_appointment(desired_date="08-08-2024 20:00", id_number=1000082, doctor_name="emily johnson")
+
+NOW PROCEED TO BOOK THE APPOINTMENT using set_appointment tool with the extracted information.
+"""
+
+COMBINED_SYSTEM_PROMPT = SHARED_PROMPT_PREFIX + """You are a specialized agent that checks doctor availability and books the appointment in one go.
+
+YOUR ONLY TOOLS:
+- check_availability_by_specialization: Check availability by specialization
+- check_availability_by_doctor: Check availability by specific doctor
+- set_appointment: Book a new appointment
+
+WORKFLOW:
+1. Check availability for the requested date with check_availability_by_specialization or check_availability_by_doctor
+2. If a slot matching the requested time is available, book it with set_appointment
+3. If nothing suitable is available, DO NOT book - report the available alternatives instead
+- Availability times are shown like "8:00 PM"; set_appointment needs 24-hour time (20:00)
+- The patient ID is given in the last user message
+- Current year is 2024
+
+EXAMPLE:
+User: "check and book a general dentist on 8 august 2024 at 8 pm", patient ID 1000082
+Action: check_availability_by_specialization(desired_date="08-08-2024", specialization="general_dentist")
+Then, if Dr. Emily Johnson has 8:00 PM free:
+Action: set_appointment(desired_date="08-08-2024 20:00", id_number=1000082, doctor_name="emily johnson")
+"""
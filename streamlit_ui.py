@@ -1,22 +1,43 @@
+import json
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
 
-API_URL = "http://127.0.0.1:8002/execute" 
+API_URL = "http://127.0.0.1:8002/execute_stream" 
 
 st.title("🩺 Doctor Appointment System")
 
 user_id = st.text_input("Enter your ID number:", "1000082")
 query = st.text_area("Enter your query:", "Can you check and make a booking if general dentist available on 8 august 2024 at 8 pm?")
 
+@st.cache_resource
+def get_session():
+    # One pooled keep-alive session shared across reruns instead of a new connection per click
+    session = requests.Session()
+    session.headers.update({"Content-Type": "application/json"})
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def stream_node_updates(response):
+    # Each line is a JSON event emitted by the API as soon as a node finishes
+    for line in response.iter_lines():
+        if not line:
+            continue
+        event = json.loads(line)
+        if "reasoning" in event:
+            yield f"**{event['node']}** → {event['next']}: {event['reasoning']}\n\n"
+        if "content" in event:
+            yield f"**{event['node']}**: {event['content']}\n\n"
+
 if st.button("Submit Query"):
     if user_id and query:
         try:
-            response = requests.post(API_URL, json={'messages': query, 'id_number': int(user_id)},verify=False)
+            response = get_session().post(API_URL, json={'messages': query, 'id_number': int(user_id)}, stream=True, timeout=60, verify=False)
             if response.status_code == 200:
                 st.success("Response Received:")
-                print("**********my response******************")
-                print(response.json())
-                st.write(response.json()["messages"])
+                st.write_stream(stream_node_updates(response))
             else:
                 st.error(f"Error {response.status_code}: Could not process the request.")
         except Exception as e:
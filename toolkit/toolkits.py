@@ -1,8 +1,296 @@
+import os
+import logging
+import threading
 import pandas as pd
+import portalocker
 from typing import Literal
 from langchain_core.tools import tool
 from pydantic import ValidationError
-from data_models.models import DateModel, DateTimeModel, IdentificationNumberModel
+from data_models.models import DateModel, DateTimeModel, IdentificationNumberModel, DATE_PATTERN, DATETIME_PATTERN
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pacsv = None
+
+logger = logging.getLogger(__name__)
+
+CSV_PATH = os.path.join("data", "doctor_availability.csv")
+CSV_COLUMNS = ['date_slot', 'specialization', 'doctor_name', 'is_available', 'patient_to_attend']
+# Bookings and cancellations are appended here and folded into the CSV by compact_journal()
+JOURNAL_PATH = os.path.join("data", "bookings.log")
+JOURNAL_MAX_BYTES = 64 * 1024
+# Serializes booking changes (and compaction) across threads and worker processes
+LOCK_PATH = CSV_PATH + ".lock"
+LOCK_TIMEOUT = 5
+
+
+def _parse_date(value, model, pattern):
+    """Validate a date string, only paying for pydantic validation when the fast regex check fails"""
+    if isinstance(value, str) and pattern.fullmatch(value):
+        return model.model_construct(date=value)
+    # Let the model raise its usual ValidationError for malformed input
+    return model(date=value)
+
+
+DOCTOR_NAMES = ('kevin anderson', 'robert martinez', 'susan davis', 'daniel miller',
+                'sarah wilson', 'michael green', 'lisa brown', 'jane smith',
+                'emily johnson', 'john doe')
+VALID_DOCTORS = frozenset(DOCTOR_NAMES)
+VALID_DOCTORS_STR = ', '.join(DOCTOR_NAMES)
+_INVALID_DOCTOR_MSG = "Invalid doctor name: '{}'. Valid doctors are: " + VALID_DOCTORS_STR
+
+# Specialization key -> display label used in tool replies
+SPECIALIZATIONS = ('general_dentist', 'cosmetic_dentist', 'prosthodontist', 'pediatric_dentist',
+                   'emergency_dentist', 'oral_surgeon', 'orthodontist')
+_SPEC_LABELS = {s: s.replace('_', ' ') for s in SPECIALIZATIONS}
+
+# 'HH:MM' slot time -> display time like '8:30 PM', for every minute of the day
+TIME_LUT = {
+    f"{h:02d}:{m:02d}": f"{h % 12 or 12}:{m:02d} {'AM' if h < 12 else 'PM'}"
+    for h in range(24) for m in range(60)
+}
+
+
+def _to_am_pm(time_str):
+    """Display time for one slot; parses by hand only for strings outside TIME_LUT (e.g. '8:30')"""
+    pretty = TIME_LUT.get(time_str)
+    if pretty is None:
+        hours, minutes = map(int, str(time_str).split(":"))
+        pretty = f"{hours % 12 or 12}:{minutes:02d} {'AM' if hours < 12 else 'PM'}"
+    return pretty
+
+# Parsed availability table, its lookup indexes and the file key they were built from, published
+# together as one snapshot. Snapshots are replaced whole and never mutated, so a reader always
+# sees a matching set. Reused for as long as the CSV and journal on disk are unchanged.
+_CACHE = {"table": None}
+# Guards reloading and publishing snapshots; tools run in executor threads
+_CACHE_LOCK = threading.Lock()
+
+
+def _file_key():
+    stat = os.stat(CSV_PATH)
+    try:
+        journal = os.stat(JOURNAL_PATH)
+        journal_key = (journal.st_mtime_ns, journal.st_size)
+    except FileNotFoundError:
+        journal_key = None
+    return (stat.st_mtime_ns, stat.st_size, journal_key)
+
+
+def _read_csv():
+    """Parse the CSV with pyarrow's multithreaded reader, falling back to pandas without it"""
+    # Only parse the columns the tools use; anything else in the file is skipped by the parser
+    if pacsv is None:
+        return pd.read_csv(CSV_PATH, usecols=CSV_COLUMNS,
+                           dtype={"date_slot": str, "specialization": str, "doctor_name": str})
+    convert_options = pacsv.ConvertOptions(
+        column_types={"is_available": pa.bool_(), "patient_to_attend": pa.float64()},
+        include_columns=CSV_COLUMNS,
+    )
+    return pacsv.read_csv(CSV_PATH, convert_options=convert_options).to_pandas()
+
+
+def _read_journal():
+    """Final (is_available, patient_id) per (date_slot, doctor_name) from the pending journal entries"""
+    changes = {}
+    if not os.path.exists(JOURNAL_PATH):
+        return changes
+    with open(JOURNAL_PATH) as f:
+        for line_number, line in enumerate(f, 1):
+            fields = line.rstrip("\n").split("|")
+            # A crash mid-append can leave a torn last line; skip it rather than failing every load
+            if (not line.endswith("\n") or len(fields) != 4
+                    or fields[0] not in ("BOOK", "CANCEL") or not fields[3].isdigit()):
+                if line.strip():
+                    logger.warning("Skipping malformed journal line %d: %r", line_number, line)
+                continue
+            op, date_slot, doctor_name, patient_id = fields
+            # Only the final state of each slot matters
+            changes[(date_slot, doctor_name)] = (False, int(patient_id)) if op == "BOOK" else (True, None)
+    return changes
+
+
+def _apply_journal(df, changes):
+    """Replay journal changes onto a freshly read table"""
+    if not changes:
+        return
+    positions = pd.MultiIndex.from_frame(df[['date_slot', 'doctor_name']]).get_indexer(list(changes))
+    for position, (is_available, patient_id) in zip(positions, changes.values()):
+        if position != -1:
+            df.loc[df.index[position], ['is_available', 'patient_to_attend']] = [is_available, patient_id]
+
+
+def _build_table(key):
+    """Parse the CSV and journal into a snapshot with date_only/time_only columns and lookup indexes"""
+    df = _read_csv()
+    _apply_journal(df, _read_journal())
+    # date_slot is fixed-width 'DD-MM-YYYY HH:MM'; dates and times repeat, so store them as categories
+    df['date_only'] = df['date_slot'].str.slice(0, 10).astype('category')
+    df['time_only'] = df['date_slot'].str.slice(11).astype('category')
+    # Few distinct names, so equality filters compare small integer codes instead of strings
+    df['doctor_name'] = df['doctor_name'].astype('category')
+    df['specialization'] = df['specialization'].astype('category')
+    df['is_available'] = df['is_available'].astype(bool)
+    # Patient IDs come back as floats with NaN for free slots; coerce once so lookups compare integers
+    df['patient_to_attend'] = pd.to_numeric(df['patient_to_attend'], errors='coerce').astype('Int64')
+    return {
+        "key": key,
+        "df": df,
+        "memo": {},
+        # Row positions per (date, doctor) and (date, specialization) for O(1) lookups
+        "by_doctor_date": df.groupby(['date_only', 'doctor_name'], observed=True).indices,
+        "by_spec_date": df.groupby(['date_only', 'specialization'], observed=True).indices,
+    }
+
+
+def _load_table():
+    """Return the current table snapshot, parsing the files again only when they changed"""
+    with _CACHE_LOCK:
+        # Stat before reading: a write that lands mid-parse leaves the snapshot keyed older than
+        # its data, which only costs one more reload
+        key = _file_key()
+        table = _CACHE["table"]
+        if table is None or table["key"] != key:
+            table = _CACHE["table"] = _build_table(key)
+        return table
+
+
+def _lookup(table, index_name, key):
+    """Return the rows of a table snapshot stored under `key` in the given lookup index"""
+    return table["df"].iloc[table[index_name].get(key, [])]
+
+
+def _write_journal(table, df, entries):
+    """
+    Append (op, date_slot, doctor_name, patient_id) entries to the journal instead of
+    rewriting the whole CSV, then publish `df` (an updated copy of the snapshot's table
+    that already holds the changes) as the new snapshot. Caller must hold _booking_lock().
+    """
+    record = "".join(f"{op}|{date_slot}|{doctor_name}|{patient_id}\n" for op, date_slot, doctor_name, patient_id in entries)
+    # Append and publish under the cache lock, so no reader can reload in between and have
+    # its snapshot stamped with the new key
+    with _CACHE_LOCK:
+        # One write per change set, flushed before the new key is taken
+        with open(JOURNAL_PATH, 'a+b') as f:
+            # Close off a torn line left by a crash with an extra field, so replay still
+            # rejects it and it can't swallow these entries
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    record = "|torn\n" + record
+            f.write(record.encode())
+            f.flush()
+        # Writes never touch the indexed columns, so reuse the indexes instead of parsing again
+        _CACHE["table"] = dict(table, df=df, key=_file_key(), memo={})
+    if os.path.getsize(JOURNAL_PATH) > JOURNAL_MAX_BYTES:
+        _compact_journal()
+
+
+def _booking_lock():
+    """File lock held around every read-modify-write of the availability table"""
+    return portalocker.Lock(LOCK_PATH, 'w', timeout=LOCK_TIMEOUT)
+
+
+def compact_journal():
+    """Fold pending journal entries into the CSV and truncate the journal"""
+    with _booking_lock():
+        _compact_journal()
+
+
+def _compact_journal():
+    # Caller must hold _booking_lock()
+    if not os.path.exists(JOURNAL_PATH):
+        return
+    # Rewrite from a full, untyped read rather than the cached table: the loader only keeps
+    # CSV_COLUMNS, and any other column in the file must survive compaction unchanged
+    full = pd.read_csv(CSV_PATH, dtype=str, keep_default_na=False)
+    changes = {slot: (str(is_available), "" if patient_id is None else str(patient_id))
+               for slot, (is_available, patient_id) in _read_journal().items()}
+    _apply_journal(full, changes)
+    # Write beside the CSV and swap it in, so no reader ever parses a half-written file
+    tmp_path = CSV_PATH + ".tmp"
+    full.to_csv(tmp_path, index=False)
+    with _CACHE_LOCK:
+        table = _CACHE["table"]
+        current = table is not None and table["key"] == _file_key()
+        # Replaying the journal is idempotent, so a reader between these two steps is still right
+        os.replace(tmp_path, CSV_PATH)
+        os.remove(JOURNAL_PATH)
+        # A snapshot that was current already holds the compacted content; just re-key it
+        if current:
+            _CACHE["table"] = dict(table, key=_file_key())
+
+
+# Availability answers as plain data, memoized on the snapshot they were read from. Every
+# booking change publishes a new snapshot, so a memoized answer can never outlive its data.
+AVAILABILITY_MEMO_MAX = 1024
+
+
+def _memoize(table, memo_key, build):
+    memo = table["memo"]
+    result = memo.get(memo_key)
+    if result is None:
+        # Bound the memo of a long-lived snapshot; it only holds cheap-to-rebuild answers
+        if len(memo) >= AVAILABILITY_MEMO_MAX:
+            memo.clear()
+        result = memo[memo_key] = build()
+    return result
+
+
+def _doctor_availability(table, date, doctor_name):
+    def build():
+        doctor_rows = _lookup(table, "by_doctor_date", (date, doctor_name))
+        # time_only is categorical, so go through str before joining
+        times = doctor_rows.loc[doctor_rows['is_available'], 'time_only'].astype(str)
+        return {
+            "doctor": doctor_name,
+            "date": date,
+            # doctor_rows already holds every slot that day, booked or not
+            "scheduled": len(doctor_rows) > 0,
+            "available_slots": tuple(times),
+            "slots_text": times.str.cat(sep=', '),
+        }
+    return _memoize(table, ("doctor", date, doctor_name), build)
+
+
+def _specialization_availability(table, date, specialization):
+    def build():
+        spec_rows = _lookup(table, "by_spec_date", (date, specialization))
+        filtered_df = spec_rows[spec_rows['is_available']]
+        # Convert to AM/PM once per distinct time (time_only is categorical), then join each doctor's slots
+        pretty = filtered_df['time_only'].map(_to_am_pm)
+        slots_by_doctor = pretty.groupby(filtered_df['doctor_name'], observed=True).agg(', '.join)
+        return {
+            "specialization": specialization,
+            "date": date,
+            "scheduled": len(spec_rows) > 0,
+            "available_slots": slots_by_doctor.to_dict(),
+        }
+    return _memoize(table, ("specialization", date, specialization), build)
+
+
+def _format_doctor_availability(result):
+    doctor = result["doctor"].title()
+    if not result["available_slots"]:
+        if result["scheduled"]:
+            return f"Dr. {doctor} has no available slots on {result['date']}. All slots are booked."
+        return f"Dr. {doctor} is not available on {result['date']}."
+    return (f"Availability for Dr. {doctor} on {result['date']}:\n"
+            f"Available slots: {result['slots_text']}")
+
+
+def _format_specialization_availability(result):
+    spec_label = _SPEC_LABELS[result["specialization"]]
+    if not result["available_slots"]:
+        if result["scheduled"]:
+            return f"No available slots for {spec_label} on {result['date']}. All slots are booked."
+        return f"No {spec_label} appointments available on {result['date']}. Please try another date."
+    output = f'Available {spec_label} appointments on {result["date"]}:\n\n'
+    for doctor_name, slots in result["available_slots"].items():
+        output += f"Dr. {doctor_name.title()}:\n{slots}\n\n"
+    return output.strip()
 
 
 @tool
@@ -21,46 +309,22 @@ def check_availability_by_doctor(desired_date: str, doctor_name: str):
     doctor_name = doctor_name.lower().strip()
     
     # Validate doctor name
-    valid_doctors = ['kevin anderson', 'robert martinez', 'susan davis', 'daniel miller',
-                     'sarah wilson', 'michael green', 'lisa brown', 'jane smith', 
-                     'emily johnson', 'john doe']
-    
-    if doctor_name not in valid_doctors:
-        return f"Invalid doctor name: '{doctor_name}'. Valid doctors are: {', '.join(valid_doctors)}"
+    if doctor_name not in VALID_DOCTORS:
+        return _INVALID_DOCTOR_MSG.format(doctor_name)
     
     # Validate the date format
     try:
-        validated_date = DateModel(date=desired_date)
+        validated_date = _parse_date(desired_date, DateModel, DATE_PATTERN)
     except ValidationError as e:
         return f"Invalid date format: {str(e)}. Please use DD-MM-YYYY format (e.g., 08-08-2024)"
     
     try:
-        df = pd.read_csv(r"data/doctor_availability.csv")
-        
-        # Extract date from date_slot (format: DD-MM-YYYY HH:MM)
-        df['date_only'] = df['date_slot'].str.split(' ').str[0]
-        df['time_only'] = df['date_slot'].str.split(' ').str[1]
-        
-        rows = df[(df['date_only'] == validated_date.date) & 
-                  (df['doctor_name'] == doctor_name) & 
-                  (df['is_available'] == True)]
-
-        if len(rows) == 0:
-            # Check if doctor exists on that date but is booked
-            all_slots = df[(df['date_only'] == validated_date.date) & 
-                          (df['doctor_name'] == doctor_name)]
-            if len(all_slots) > 0:
-                return f"Dr. {doctor_name.title()} has no available slots on {validated_date.date}. All slots are booked."
-            else:
-                return f"Dr. {doctor_name.title()} is not available on {validated_date.date}."
-        else:
-            available_times = rows['time_only'].tolist()
-            output = f'Availability for Dr. {doctor_name.title()} on {validated_date.date}:\n'
-            output += "Available slots: " + ', '.join(available_times)
-            return output
+        # Take one snapshot and answer from it, memoized on that snapshot
+        result = _doctor_availability(_load_table(), validated_date.date, doctor_name)
+        return _format_doctor_availability(result)
             
     except FileNotFoundError:
-        return "Error: data/doctor_availability.csv file not found"
+        return "Error: doctor_availability.csv file not found"
     except Exception as e:
         return f"Error checking availability: {str(e)}"
 
@@ -77,47 +341,14 @@ def check_availability_by_specialization(desired_date: str, specialization: Lite
     """
     # Validate the date format
     try:
-        validated_date = DateModel(date=desired_date)
+        validated_date = _parse_date(desired_date, DateModel, DATE_PATTERN)
     except ValidationError as e:
         return f"Invalid date format: {str(e)}. Please use DD-MM-YYYY format (e.g., 08-08-2024)"
     
     try:
-        df = pd.read_csv(r"data\doctor_availability.csv")
-        
-        # Extract date and time from date_slot
-        df['date_only'] = df['date_slot'].str.split(' ').str[0]
-        df['time_only'] = df['date_slot'].str.split(' ').str[1]
-        
-        filtered_df = df[(df['date_only'] == validated_date.date) & 
-                        (df['specialization'] == specialization) & 
-                        (df['is_available'] == True)]
-        
-        if len(filtered_df) == 0:
-            # Check if any slots exist for that specialization on that date
-            all_slots = df[(df['date_only'] == validated_date.date) & 
-                          (df['specialization'] == specialization)]
-            if len(all_slots) > 0:
-                return f"No available slots for {specialization.replace('_', ' ')} on {validated_date.date}. All slots are booked."
-            else:
-                return f"No {specialization.replace('_', ' ')} appointments available on {validated_date.date}. Please try another date."
-        else:
-            # Group by doctor and collect their available time slots
-            rows = filtered_df.groupby('doctor_name')['time_only'].apply(list).reset_index()
-            
-            def convert_to_am_pm(time_str):
-                time_str = str(time_str)
-                hours, minutes = map(int, time_str.split(":"))
-                period = "AM" if hours < 12 else "PM"
-                hours = hours % 12 or 12
-                return f"{hours}:{minutes:02d} {period}"
-            
-            output = f'Available {specialization.replace("_", " ")} appointments on {validated_date.date}:\n\n'
-            for _, row in rows.iterrows():
-                doctor_name = row['doctor_name'].title()
-                slots = ', '.join([convert_to_am_pm(time) for time in row['time_only']])
-                output += f"Dr. {doctor_name}:\n{slots}\n\n"
-            
-            return output.strip()
+        # Take one snapshot and answer from it, memoized on that snapshot
+        result = _specialization_availability(_load_table(), validated_date.date, specialization)
+        return _format_specialization_availability(result)
             
     except FileNotFoundError:
         return "Error: doctor_availability.csv file not found"
@@ -138,34 +369,38 @@ def set_appointment(desired_date: str, id_number: int, doctor_name: Literal['kev
     """
     # Validate inputs
     try:
-        validated_date = DateTimeModel(date=desired_date)
+        validated_date = _parse_date(desired_date, DateTimeModel, DATETIME_PATTERN)
         validated_id = IdentificationNumberModel(id=id_number)
     except ValidationError as e:
         return f"Invalid input: {str(e)}"
     
     try:
-        df = pd.read_csv(r"data\doctor_availability.csv")
+        # Re-read and update under the lock so concurrent bookings can't both take a slot
+        with _booking_lock():
+            table = _load_table()
         
-        # The date_slot in CSV is already in DD-MM-YYYY HH:MM format
-        case = df[(df['date_slot'] == validated_date.date) & 
-                  (df['doctor_name'] == doctor_name) & 
-                  (df['is_available'] == True)]
+            # The date_slot in CSV is already in DD-MM-YYYY HH:MM format; narrow to the
+            # doctor's day first, then tell "no such slot" from "booked" on that one subset
+            day_rows = _lookup(table, "by_doctor_date", (validated_date.date[:10], doctor_name))
+            slot_exists = day_rows[day_rows['date_slot'] == validated_date.date]
+            case = slot_exists[slot_exists['is_available'] == True]
         
-        if len(case) == 0:
-            # Check why it's not available
-            slot_exists = df[(df['date_slot'] == validated_date.date) & (df['doctor_name'] == doctor_name)]
-            if len(slot_exists) == 0:
-                return f"No appointment slot exists for Dr. {doctor_name.title()} at {validated_date.date}. Please check availability first."
+            if len(case) == 0:
+                if len(slot_exists) == 0:
+                    return f"No appointment slot exists for Dr. {doctor_name.title()} at {validated_date.date}. Please check availability first."
+                else:
+                    return f"The slot at {validated_date.date} with Dr. {doctor_name.title()} is already booked."
             else:
-                return f"The slot at {validated_date.date} with Dr. {doctor_name.title()} is already booked."
-        else:
-            df.loc[(df['date_slot'] == validated_date.date) & 
-                   (df['doctor_name'] == doctor_name) & 
-                   (df['is_available'] == True), ['is_available','patient_to_attend']] = [False, validated_id.id]
-            df.to_csv('data\doctor_availability.csv', index=False)
-
-            return f"✓ Appointment successfully booked!\nDoctor: Dr. {doctor_name.title()}\nDate & Time: {validated_date.date}\nPatient ID: {validated_id.id}"
+                # Reuse the rows already found instead of rebuilding the mask; change a copy
+                # so readers holding the current snapshot never see a half-applied update
+                df = table["df"].copy()
+                df.loc[case.index, ['is_available','patient_to_attend']] = [False, validated_id.id]
+                _write_journal(table, df, [("BOOK", validated_date.date, doctor_name, validated_id.id)])
+
+                return f"✓ Appointment successfully booked!\nDoctor: Dr. {doctor_name.title()}\nDate & Time: {validated_date.date}\nPatient ID: {validated_id.id}"
             
+    except portalocker.LockException:
+        return "The booking system is busy right now. Please try again in a moment."
     except FileNotFoundError:
         return "Error: doctor_availability.csv file not found"
     except Exception as e:
@@ -184,31 +419,33 @@ def cancel_appointment(date: str, id_number: int, doctor_name: Literal['kevin an
     """
     # Validate inputs
     try:
-        validated_date = DateTimeModel(date=date)
+        validated_date = _parse_date(date, DateTimeModel, DATETIME_PATTERN)
         validated_id = IdentificationNumberModel(id=id_number)
     except ValidationError as e:
         return f"Invalid input: {str(e)}"
     
     try:
-        df = pd.read_csv(r"data\doctor_availability.csv")
-        
-        # Convert patient_to_attend to int for comparison (it might be stored as float with NaN)
-        df['patient_to_attend'] = pd.to_numeric(df['patient_to_attend'], errors='coerce')
+        # Re-read and update under the lock so concurrent bookings can't both take a slot
+        with _booking_lock():
+            table = _load_table()
+            df = table["df"]
         
-        case_to_remove = df[(df['date_slot'] == validated_date.date) & 
-                            (df['patient_to_attend'] == validated_id.id) & 
-                            (df['doctor_name'] == doctor_name)]
+            case_to_remove = df[(df['date_slot'] == validated_date.date) & 
+                                (df['patient_to_attend'] == validated_id.id) & 
+                                (df['doctor_name'] == doctor_name)]
         
-        if len(case_to_remove) == 0:
-            return f"No appointment found for patient ID {validated_id.id} with Dr. {doctor_name.title()} on {validated_date.date}"
-        else:
-            df.loc[(df['date_slot'] == validated_date.date) & 
-                   (df['patient_to_attend'] == validated_id.id) & 
-                   (df['doctor_name'] == doctor_name), ['is_available', 'patient_to_attend']] = [True, None]
-            df.to_csv('data\doctor_availability.csv', index=False)
-
-            return f"✓ Appointment successfully cancelled for patient ID {validated_id.id} with Dr. {doctor_name.title()} on {validated_date.date}"
+            if len(case_to_remove) == 0:
+                return f"No appointment found for patient ID {validated_id.id} with Dr. {doctor_name.title()} on {validated_date.date}"
+            else:
+                # Reuse the rows already found instead of rebuilding the mask, on a copy
+                df = df.copy()
+                df.loc[case_to_remove.index, ['is_available', 'patient_to_attend']] = [True, None]
+                _write_journal(table, df, [("CANCEL", validated_date.date, doctor_name, validated_id.id)])
+
+                return f"✓ Appointment successfully cancelled for patient ID {validated_id.id} with Dr. {doctor_name.title()} on {validated_date.date}"
             
+    except portalocker.LockException:
+        return "The booking system is busy right now. Please try again in a moment."
     except FileNotFoundError:
         return "Error: doctor_availability.csv file not found"
     except Exception as e:
@@ -228,41 +465,45 @@ def reschedule_appointment(old_date: str, new_date: str, id_number: int, doctor_
     """
     # Validate inputs
     try:
-        validated_old_date = DateTimeModel(date=old_date)
-        validated_new_date = DateTimeModel(date=new_date)
+        validated_old_date = _parse_date(old_date, DateTimeModel, DATETIME_PATTERN)
+        validated_new_date = _parse_date(new_date, DateTimeModel, DATETIME_PATTERN)
         validated_id = IdentificationNumberModel(id=id_number)
     except ValidationError as e:
         return f"Invalid input: {str(e)}"
     
     try:
-        df = pd.read_csv(r"data\doctor_availability.csv")
-        available_for_desired_date = df[(df['date_slot'] == validated_new_date.date) & 
-                                        (df['is_available'] == True) & 
-                                        (df['doctor_name'] == doctor_name)]
+        # Re-read and update under the lock so concurrent bookings can't both take a slot
+        with _booking_lock():
+            table = _load_table()
+            df = table["df"]
         
-        if len(available_for_desired_date) == 0:
-            return f"Dr. {doctor_name.title()} is not available at {validated_new_date.date}. Please choose another time slot."
-        else:
-            cancel_result = cancel_appointment.invoke({
-                'date': validated_old_date.date, 
-                'id_number': validated_id.id, 
-                'doctor_name': doctor_name
-            })
-            
-            if "No appointment found" in cancel_result:
-                return cancel_result
-            
-            set_result = set_appointment.invoke({
-                'desired_date': validated_new_date.date, 
-                'id_number': validated_id.id, 
-                'doctor_name': doctor_name
-            })
-            
-            if "successfully booked" in set_result:
-                return f"✓ Appointment successfully rescheduled from {validated_old_date.date} to {validated_new_date.date} with Dr. {doctor_name.title()}"
-            else:
-                return set_result
+            new_slot = ((df['date_slot'] == validated_new_date.date) & 
+                        (df['is_available'] == True) & 
+                        (df['doctor_name'] == doctor_name))
+        
+            if not new_slot.any():
+                return f"Dr. {doctor_name.title()} is not available at {validated_new_date.date}. Please choose another time slot."
+        
+            old_slot = ((df['date_slot'] == validated_old_date.date) & 
+                        (df['patient_to_attend'] == validated_id.id) & 
+                        (df['doctor_name'] == doctor_name))
+        
+            if not old_slot.any():
+                return f"No appointment found for patient ID {validated_id.id} with Dr. {doctor_name.title()} on {validated_old_date.date}"
+        
+            # Free the old slot and take the new one on a copy, then journal both at once
+            df = df.copy()
+            df.loc[old_slot, ['is_available', 'patient_to_attend']] = [True, None]
+            df.loc[new_slot, ['is_available', 'patient_to_attend']] = [False, validated_id.id]
+            _write_journal(table, df, [
+                ("CANCEL", validated_old_date.date, doctor_name, validated_id.id),
+                ("BOOK", validated_new_date.date, doctor_name, validated_id.id),
+            ])
+        
+            return f"✓ Appointment successfully rescheduled from {validated_old_date.date} to {validated_new_date.date} with Dr. {doctor_name.title()}"
                 
+    except portalocker.LockException:
+        return "The booking system is busy right now. Please try again in a moment."
     except FileNotFoundError:
         return "Error: doctor_availability.csv file not found"
     except Exception as e:
@@ -1,10 +1,23 @@
 import os
+import functools
 from langchain_groq import ChatGroq
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 
 load_dotenv()
 
+# Main model per provider, used by the agents that reason and call tools
+DEFAULT_MODELS = {
+    "groq": "llama-3.1-8b-instant",
+    "openai": "gpt-4o",
+}
+
+# Main model -> smaller, faster model for the supervisor's routing decision. Models
+# without an entry (e.g. Groq's 8B default) are already small and route themselves.
+ROUTER_MODELS = {
+    "gpt-4o": "gpt-4o-mini",
+}
+
 class LLMModel:
     def __init__(self, model_name="llama-3.1-8b-instant", provider="groq"):
         """
@@ -47,6 +60,40 @@ class LLMModel:
         return self.model
 
 
+@functools.lru_cache(maxsize=None)
+def _client(model_name, provider):
+    # One client per (model, provider), so its HTTP connection pool is reused process-wide
+    return LLMModel(model_name, provider).get_model()
+
+
+def get_provider():
+    """Provider for every model of the app, from LLM_PROVIDER (default 'groq')"""
+    provider = os.getenv("LLM_PROVIDER", "groq").lower()
+    if provider not in DEFAULT_MODELS:
+        raise ValueError(f"Unsupported provider: {provider}. Choose 'groq' or 'openai'.")
+    return provider
+
+
+def get_model_name():
+    """Main model, from LLM_MODEL or the provider's default"""
+    return os.getenv("LLM_MODEL") or DEFAULT_MODELS[get_provider()]
+
+
+def get_llm():
+    """Return the shared client of the main model"""
+    return _client(get_model_name(), get_provider())
+
+
+def get_router_llm():
+    """
+    Return the shared client of the routing model: ROUTER_MODEL, else the smaller
+    sibling of the main model, else the main model's own client
+    """
+    model_name = get_model_name()
+    router_model_name = os.getenv("ROUTER_MODEL") or ROUTER_MODELS.get(model_name, model_name)
+    return _client(router_model_name, get_provider())
+
+
 if __name__ == "__main__":
     # Default: Uses Groq's Llama model
     llm_instance = LLMModel()  
@@ -58,4 +105,4 @@ if __name__ == "__main__":
     
     # Optional: Use OpenAI instead
     # llm_instance = LLMModel(model_name="gpt-4o", provider="openai")
-    # llm_model = llm_instance.get_model()
\ No newline at end of file
+    # llm_model = llm_instance.get_model()